@@ -1,9 +1,14 @@
 import os
-import json
+import sys
+import string
+import functools
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Set
-from collections import defaultdict
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List
+from collections import Counter, defaultdict
+from itertools import islice
 from dotenv import load_dotenv
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
@@ -14,40 +19,172 @@ from slack_sdk.socket_mode.response import SocketModeResponse
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging (per-event logs are at DEBUG level)
+log_level = getattr(logging, os.environ.get("LOG_LEVEL", "INFO").upper(), None)
+logging.basicConfig(level=log_level if isinstance(log_level, int) else logging.INFO)
 logger = logging.getLogger(__name__)
+if not isinstance(log_level, int):
+    logger.warning("Unknown LOG_LEVEL %r, using INFO", os.environ.get("LOG_LEVEL"))
+
+def intern_id(value: str) -> str:
+    """Intern Slack IDs and timestamps so repeated values share one string object"""
+    return sys.intern(value) if value else value
+
+class ContainerPool:
+    """Keep emptied containers around so they can be reused instead of reallocated"""
+    def __init__(self, factory, max_size: int = 1000):
+        self._containers = []
+        self._factory = factory  # e.g. set or dict
+        self._max_size = max_size
+        
+    def add(self, container):
+        """Return a container to the pool"""
+        if len(self._containers) < self._max_size:
+            container.clear()
+            self._containers.append(container)
+            
+    def get(self):
+        """Get an empty container, reusing a pooled one when available"""
+        return self._containers.pop() if self._containers else self._factory()
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at a fixed rate"""
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate  # tokens per second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        
+    def consume(self, tokens: int = 1):
+        """Take tokens from the bucket, waiting until enough are available"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+class RateLimitedClient:
+    """WebClient proxy that throttles API calls and retries rate-limited ones"""
+    def __init__(self, client: WebClient, rate: float = 1.0, burst: int = 5, max_retries: int = 3):
+        self._client = client
+        self._bucket = TokenBucket(rate, burst)
+        self._max_retries = max_retries
+        
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+            
+        @functools.wraps(attr)
+        def call(*args, **kwargs):
+            for attempt in range(self._max_retries + 1):
+                self._bucket.consume()
+                try:
+                    return attr(*args, **kwargs)
+                except SlackApiError as e:
+                    if e.response.status_code != 429 or attempt == self._max_retries:
+                        raise
+                    # Honor Retry-After when Slack sends it, else back off exponentially
+                    retry_after = e.response.headers.get("Retry-After") or e.response.headers.get("retry-after")
+                    delay = float(retry_after) if retry_after else 2 ** attempt
+                    logger.warning("Rate limited on %s, retrying in %.1fs", name, delay)
+                    time.sleep(delay)
+        return call
 
 class SlackMessageTracker:
+    __slots__ = (
+        "client", "socket_client", "_bot_user_id",
+        "user_inbox_counts", "channel_msg_count", "user_channel_offset", "channel_members", "_tracking_channels",
+        "user_saved_messages", "_saved_pool", "_savers_pool", "_total_saved",
+        "message_reactions", "active_users",
+        "_members_ttl", "_members_fetched_at", "_users_list_cache", "_users_list_ttl",
+        "_stats_timer", "_stats_dirty", "_lock",
+    )
+    
     def __init__(self):
-        self.client = WebClient(token=os.environ.get("SLACK_BOT_TOKEN"))
+        web_client = WebClient(token=os.environ.get("SLACK_BOT_TOKEN"))
+        self.client = RateLimitedClient(web_client)
         self.socket_client = SocketModeClient(
             app_token=os.environ.get("SLACK_APP_TOKEN"),
-            web_client=self.client
+            web_client=web_client
         )
+        self._bot_user_id = None  # resolved in start()
         
         # Data structures to track messages
-        self.user_inbox_counts = defaultdict(int)  # user_id -> message_count
-        self.user_saved_messages = defaultdict(set)  # user_id -> set of message_ids
-        self.user_reminders = defaultdict(list)  # user_id -> list of reminder messages
-        self.message_reactions = defaultdict(dict)  # message_id -> {user_id: reaction_type}
+        self.user_inbox_counts = Counter()  # user_id -> message_count from channels the user left
+        self.channel_msg_count = defaultdict(int)  # channel_id -> messages seen in the channel
+        self.user_channel_offset = defaultdict(dict)  # user_id -> {channel_id: channel count not in the user's inbox}
+        self.channel_members = {}  # channel_id -> set of user_ids counted in the channel
+        self._tracking_channels = {}  # channel_id -> (handler, event) received while its members are being fetched
+        self.user_saved_messages = {}  # user_id -> {message_id: None}, an ordered set in save order
+        self._saved_pool = ContainerPool(dict)
+        self._savers_pool = ContainerPool(set)
+        self._total_saved = 0  # sum of the sizes of all user_saved_messages entries
+        self.message_reactions = {}  # message_id -> set of user_ids who saved it
         
         # Track users who have interacted with the bot
         self.active_users = set()
         
+        # Channel members are fetched again after this long to repair missed membership events
+        self._members_ttl = 600  # seconds
+        self._members_fetched_at: Dict[str, float] = {}  # channel_id -> when its members were last registered
+        
+        # Cache of the workspace user list for the statistics output
+        self._users_list_cache = None  # (fetched_at, {user_id: name})
+        self._users_list_ttl = 600  # seconds
+        
+        # Timer driving the periodic statistics output; the report is only
+        # rebuilt when the handlers changed something since the last one
+        self._stats_timer = None
+        self._stats_dirty = True
+        
+        # The socket mode client runs listeners on its own worker threads;
+        # the lock guards the tracking data shared between them
+        self._lock = threading.RLock()
+        
         # Register event handlers
         self.socket_client.socket_mode_request_listeners.append(self.handle_socket_mode_request)
         
     def start(self):
         """Start the bot"""
         logger.info("Starting Slack Message Tracker Bot...")
+        try:
+            # Needed to notice when the bot itself leaves a channel
+            self._bot_user_id = self.client.auth_test()["user_id"]
+        except SlackApiError as e:
+            logger.error("Error getting bot user: %s", e)
         self.socket_client.connect()
         
     def stop(self):
         """Stop the bot"""
         logger.info("Stopping Slack Message Tracker Bot...")
+        timer, self._stats_timer = self._stats_timer, None
+        if timer:
+            timer.cancel()
         self.socket_client.disconnect()
         
+    def start_statistics_timer(self, interval: float = 5):
+        """Print statistics every `interval` seconds on a background thread"""
+        self._stats_timer = threading.Timer(interval, self._print_statistics_periodically, args=(interval,))
+        self._stats_timer.daemon = True
+        self._stats_timer.start()
+        
+    def _print_statistics_periodically(self, interval: float):
+        """Print statistics and schedule the next run unless the bot was stopped"""
+        try:
+            self.print_statistics()
+        except Exception as e:
+            logger.error("Error printing statistics: %s", e)
+            
+        if self._stats_timer is not None:
+            self.start_statistics_timer(interval)
+        
     def handle_socket_mode_request(self, client: SocketModeClient, req: SocketModeRequest):
         """Handle incoming socket mode requests"""
         try:
@@ -59,7 +196,7 @@ class SlackMessageTracker:
                 # Process the event
                 self.process_event(req.payload)
         except Exception as e:
-            logger.error(f"Error handling socket mode request: {e}")
+            logger.error("Error handling socket mode request: %s", e)
             
     def process_event(self, payload: dict):
         """Process different types of Slack events"""
@@ -74,62 +211,167 @@ class SlackMessageTracker:
             self.handle_reaction_removed(event)
         elif event_type == "app_mention":
             self.handle_app_mention(event)
+        elif event_type in ("member_joined_channel", "member_left_channel", "channel_left"):
+            self.handle_member_changed(event)
             
     def handle_message_event(self, event: dict):
         """Handle new message events"""
-        user_id = event.get("user")
-        channel_id = event.get("channel")
+        user_id = intern_id(event.get("user"))
+        channel_id = intern_id(event.get("channel"))
         message_id = event.get("ts")
         
         if user_id and not event.get("bot_id"):
-            # Increment inbox count for all users in the channel
-            try:
-                # Get channel members
-                members = self.get_channel_members(channel_id)
-                for member_id in members:
-                    if member_id != user_id:  # Don't count sender's own messages
-                        self.user_inbox_counts[member_id] += 1
-                        self.active_users.add(member_id)
-                        
-                logger.info(f"Message from {user_id} in {channel_id} - Updated inbox counts for {len(members)-1} users")
+            with self._lock:
+                pending = self._tracking_channels.get(channel_id)
+                if pending is not None:
+                    # Counted once the channel's members are registered
+                    pending.append((self.handle_message_event, event))
+                    return
+                    
+                # Members are looked up the first time a channel is seen, then again
+                # every few minutes to repair any missed join/leave events
+                fetched_at = self._members_fetched_at.get(channel_id)
+                if fetched_at is None or time.monotonic() - fetched_at >= self._members_ttl:
+                    # This message is replayed first, once the members are registered
+                    self._tracking_channels[channel_id] = [(self.handle_message_event, event)]
+                else:
+                    # Count the message once for the channel; members' inboxes are derived from it
+                    self.channel_msg_count[channel_id] += 1
+                    count = self.channel_msg_count[channel_id]
+                    
+                    # Don't count sender's own messages
+                    offsets = self.user_channel_offset.get(user_id)
+                    if offsets is not None and channel_id in offsets:
+                        offsets[channel_id] += 1
+                    self._stats_dirty = True
+                    
+                    logger.debug("Message from %s in %s - Channel message count: %d", user_id, channel_id, count)
+                    return
+                    
+            self.track_channel(channel_id)
                 
-            except SlackApiError as e:
-                logger.error(f"Error getting channel members: {e}")
+    def track_channel(self, channel_id: str):
+        """Register the current members of a channel, or reconcile them with the tracked ones"""
+        # The caller has marked the channel in _tracking_channels, so events for it
+        # arriving during the API call are queued there instead of being lost
+        members = self.get_channel_members(channel_id)
+        
+        with self._lock:
+            pending = self._tracking_channels.pop(channel_id, [])
+            if not members:
+                if channel_id not in self.channel_msg_count:
+                    # Like a failed lookup before, the queued messages are not counted
+                    return
+                # Keep counting with the members we have and retry after the TTL
+                self._members_fetched_at[channel_id] = time.monotonic()
+            else:
+                self._members_fetched_at[channel_id] = time.monotonic()
+                count = self.channel_msg_count[channel_id]
+                tracked = self.channel_members.setdefault(channel_id, set())
+                fetched = set(members)
+                
+                # Members who left without us seeing the event keep what they received
+                for member_id in tracked - fetched:
+                    self._remove_channel_member(channel_id, member_id)
+                    
+                user_channel_offset = self.user_channel_offset  # bound once for the loop
+                for member_id in fetched - tracked:
+                    user_channel_offset[member_id].setdefault(channel_id, count)
+                tracked |= fetched
+                self.active_users.update(fetched)
+                self._stats_dirty = True
+                
+            # The fetched list may predate these events, so apply them on top of it
+            for handler, event in pending:
+                handler(event)
                 
+    def _add_channel_member(self, channel_id: str, user_id: str):
+        """Start counting channel messages sent from now on in a user's inbox"""
+        self.user_channel_offset[user_id].setdefault(channel_id, self.channel_msg_count[channel_id])
+        self.channel_members.setdefault(channel_id, set()).add(user_id)
+        self.active_users.add(user_id)
+        self._stats_dirty = True
+        
+    def _remove_channel_member(self, channel_id: str, user_id: str):
+        """Stop counting a channel for a user, keeping the messages already received"""
+        self.channel_members.get(channel_id, set()).discard(user_id)
+        offsets = self.user_channel_offset.get(user_id)
+        offset = offsets.pop(channel_id, None) if offsets is not None else None
+        if offset is not None:
+            self.user_inbox_counts[user_id] += self.channel_msg_count[channel_id] - offset
+            self._stats_dirty = True
+            
+    def _untrack_channel(self, channel_id: str):
+        """Stop tracking a channel the bot is no longer in"""
+        for member_id in list(self.channel_members.get(channel_id, ())):
+            self._remove_channel_member(channel_id, member_id)
+        self.channel_members.pop(channel_id, None)
+        self.channel_msg_count.pop(channel_id, None)
+        self._members_fetched_at.pop(channel_id, None)
+        
+    def get_inbox_count(self, user_id: str) -> int:
+        """Get the number of inbox messages for a user"""
+        with self._lock:
+            inbox_count = self.user_inbox_counts.get(user_id, 0)
+            channel_msg_count = self.channel_msg_count  # bound once for the loop
+            for channel_id, offset in self.user_channel_offset.get(user_id, {}).items():
+                inbox_count += channel_msg_count[channel_id] - offset
+        return inbox_count
+        
     def handle_reaction_added(self, event: dict):
         """Handle reaction added events (saved for others)"""
-        user_id = event.get("user")
-        message_id = event.get("item", {}).get("ts")
-        reaction = event.get("reaction")
+        # Only save messages with inbox_tray emoji
+        if event.get("reaction") != "inbox_tray":
+            return
+            
+        user_id = intern_id(event.get("user"))
+        message_id = intern_id(event.get("item", {}).get("ts"))
         
         if user_id and message_id:
-            # Only save messages with inbox_tray emoji
-            if reaction == "inbox_tray":
-                self.user_saved_messages[user_id].add(message_id)
-                self.message_reactions[message_id][user_id] = reaction
+            with self._lock:
+                saved_messages = self.user_saved_messages.get(user_id)
+                if saved_messages is None:
+                    saved_messages = self._saved_pool.get()
+                    self.user_saved_messages[user_id] = saved_messages
+                if message_id not in saved_messages:
+                    saved_messages[message_id] = None
+                    self._total_saved += 1
+                savers = self.message_reactions.get(message_id)
+                if savers is None:
+                    savers = self.message_reactions[message_id] = self._savers_pool.get()
+                savers.add(user_id)
                 self.active_users.add(user_id)
-                logger.info(f"User {user_id} saved message {message_id} with inbox_tray reaction")
-            else:
-                logger.info(f"User {user_id} added reaction '{reaction}' to message {message_id} (not saved)")
+                self._stats_dirty = True
+            logger.debug("User %s saved message %s with inbox_tray reaction", user_id, message_id)
             
     def handle_reaction_removed(self, event: dict):
         """Handle reaction removed events"""
-        user_id = event.get("user")
-        message_id = event.get("item", {}).get("ts")
-        reaction = event.get("reaction")
+        # Only handle inbox_tray reaction removal
+        if event.get("reaction") != "inbox_tray":
+            return
+            
+        user_id = intern_id(event.get("user"))
+        message_id = intern_id(event.get("item", {}).get("ts"))
         
         if user_id and message_id:
-            # Only handle inbox_tray reaction removal
-            if reaction == "inbox_tray":
-                self.user_saved_messages[user_id].discard(message_id)
-                if user_id in self.message_reactions[message_id]:
-                    del self.message_reactions[message_id][user_id]
-                # Clean up empty message_reactions entry
-                if not self.message_reactions[message_id]:
-                    del self.message_reactions[message_id]
-                logger.info(f"User {user_id} unsaved message {message_id} (removed inbox_tray)")
-            else:
-                logger.info(f"User {user_id} removed reaction '{reaction}' from message {message_id} (not saved)")
+            with self._lock:
+                saved_messages = self.user_saved_messages.get(user_id)
+                if saved_messages is not None and message_id in saved_messages:
+                    del saved_messages[message_id]
+                    self._total_saved -= 1
+                    # Recycle the container once the user has nothing saved
+                    if not saved_messages:
+                        del self.user_saved_messages[user_id]
+                        self._saved_pool.add(saved_messages)
+                savers = self.message_reactions.get(message_id)
+                if savers is not None:
+                    savers.discard(user_id)
+                    # Clean up empty message_reactions entry
+                    if not savers:
+                        del self.message_reactions[message_id]
+                        self._savers_pool.add(savers)
+                self._stats_dirty = True
+            logger.debug("User %s unsaved message %s (removed inbox_tray)", user_id, message_id)
             
     def handle_app_mention(self, event: dict):
         """Handle when the bot is mentioned"""
@@ -137,24 +379,87 @@ class SlackMessageTracker:
         channel_id = event.get("channel")
         text = event.get("text", "")
         
-        if "stats" in text.lower() or "statistics" in text.lower():
+        # Lowercase and split the text once, then match whole words
+        words = {word.strip(string.punctuation) for word in text.lower().split()}
+        if "stats" in words or "statistics" in words:
             self.send_user_stats(user_id, channel_id)
-        elif "help" in text.lower():
+        elif "help" in words:
             self.send_help_message(channel_id)
             
+    def handle_member_changed(self, event: dict):
+        """Handle users, or the bot itself, joining or leaving a channel"""
+        event_type = event.get("type")
+        user_id = intern_id(event.get("user"))
+        channel_id = intern_id(event.get("channel"))
+        bot_left = event_type == "channel_left" or (
+            event_type == "member_left_channel" and user_id is not None and user_id == self._bot_user_id
+        )
+        
+        with self._lock:
+            pending = self._tracking_channels.get(channel_id)
+            if (user_id or bot_left) and pending is not None:
+                # Applied once the channel's members are registered
+                pending.append((self.handle_member_changed, event))
+                return
+                
+            if channel_id not in self.channel_msg_count:
+                return
+                
+            if bot_left:
+                # Members are fetched again if the bot is added back
+                self._untrack_channel(channel_id)
+            elif not user_id:
+                return
+            elif event_type == "member_joined_channel":
+                # Only messages sent from now on are part of the new member's inbox
+                self._add_channel_member(channel_id, user_id)
+            else:
+                # Keep the messages received while the user was in the channel
+                self._remove_channel_member(channel_id, user_id)
+        
     def get_channel_members(self, channel_id: str) -> List[str]:
         """Get list of member IDs in a channel"""
         try:
             response = self.client.conversations_members(channel=channel_id)
-            return response["members"]
+            return [intern_id(member_id) for member_id in response["members"]]
         except SlackApiError as e:
-            logger.error(f"Error getting channel members: {e}")
+            logger.error("Error getting channel members: %s", e)
             return []
             
+    def _refresh_users_list(self) -> Dict[str, str]:
+        """Get a user_id -> name map for the workspace (cached for a few minutes)"""
+        cached = self._users_list_cache
+        if cached and time.monotonic() - cached[0] < self._users_list_ttl:
+            return cached[1]
+            
+        names = {}
+        cursor = None
+        try:
+            while True:
+                response = self.client.users_list(limit=1000, cursor=cursor)
+                for user_info in response["members"]:
+                    names[user_info["id"]] = user_info.get("real_name") or user_info.get("name", user_info["id"])
+                cursor = response.get("response_metadata", {}).get("next_cursor")
+                if not cursor:
+                    break
+        except SlackApiError as e:
+            logger.error("Error getting users list: %s", e)
+            # Keep serving the previous list rather than losing all names
+            return cached[1] if cached else {}
+            
+        self._users_list_cache = (time.monotonic(), names)
+        return names
+        
+    def get_user_names(self, user_ids) -> Dict[str, str]:
+        """Get display names for users, falling back to the user ID"""
+        names = self._refresh_users_list()
+        return {user_id: names.get(user_id, user_id) for user_id in user_ids}
+        
     def send_user_stats(self, user_id: str, channel_id: str):
         """Send statistics for a specific user"""
-        inbox_count = self.user_inbox_counts.get(user_id, 0)
-        saved_count = len(self.user_saved_messages.get(user_id, set()))
+        with self._lock:
+            inbox_count = self.get_inbox_count(user_id)
+            saved_count = len(self.user_saved_messages.get(user_id, ()))
         
         stats_text = f"📊 *Your Statistics:*\n• Inbox messages: {inbox_count}\n• Saved messages: {saved_count}"
         
@@ -165,7 +470,7 @@ class SlackMessageTracker:
                 text=stats_text
             )
         except SlackApiError as e:
-            logger.error(f"Error sending stats: {e}")
+            logger.error("Error sending stats: %s", e)
             
     def send_help_message(self, channel_id: str):
         """Send help message"""
@@ -183,7 +488,7 @@ class SlackMessageTracker:
 
 *How to save messages:*
 • Add 📥 (inbox_tray) reaction to any message to save it for others
-• Other reactions are tracked but not counted as saved messages
+• Other reactions are ignored
         """
         
         try:
@@ -192,62 +497,79 @@ class SlackMessageTracker:
                 text=help_text
             )
         except SlackApiError as e:
-            logger.error(f"Error sending help: {e}")
+            logger.error("Error sending help: %s", e)
             
-    def print_statistics(self):
-        """Print comprehensive statistics to console"""
-        print("\n" + "="*60)
-        print("📊 SLACK MESSAGE TRACKER STATISTICS")
-        print("="*60)
-        print(f"Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"Active users: {len(self.active_users)}")
-        print("-"*60)
-        
-        if not self.active_users:
-            print("No active users found.")
-            return
+    def print_statistics(self, force: bool = False):
+        """Print comprehensive statistics to console if anything changed since the last report"""
+        # Get user names for better display, without holding the lock during the API call
+        with self._lock:
+            if not self._stats_dirty and not force:
+                return
+            self._stats_dirty = False
+            active_users = list(self.active_users)
             
-        # Get user names for better display
-        user_names = {}
-        for user_id in self.active_users:
-            try:
-                response = self.client.users_info(user=user_id)
-                user_info = response["user"]
-                user_names[user_id] = user_info.get("real_name", user_info.get("name", user_id))
-            except SlackApiError:
-                user_names[user_id] = user_id
-                
-        # Print individual user statistics
-        for user_id in sorted(self.active_users):
-            name = user_names[user_id]
-            inbox_count = self.user_inbox_counts.get(user_id, 0)
-            saved_count = len(self.user_saved_messages.get(user_id, set()))
+        try:
+            user_names = self.get_user_names(active_users) if active_users else {}
             
-            print(f"👤 {name} ({user_id})")
-            print(f"   💾 Inbox messages: {inbox_count}")
-            print(f"   📥 Saved messages for others: {saved_count}")
+            # Build the whole report first and write it in one go
+            lines = self._format_statistics(user_names)
+            sys.stdout.write("\n".join(lines) + "\n")
+        except Exception:
+            # Nothing was printed, so try again on the next tick
+            with self._lock:
+                self._stats_dirty = True
+            raise
+        
+    def _format_statistics(self, user_names: Dict[str, str]) -> List[str]:
+        """Build the lines of the statistics report"""
+        with self._lock:
+            lines = [
+                "",
+                "="*60,
+                "📊 SLACK MESSAGE TRACKER STATISTICS",
+                "="*60,
+                f"Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                f"Active users: {len(self.active_users)}",
+                "-"*60,
+            ]
             
-            # Show some saved message details
-            saved_messages = self.user_saved_messages.get(user_id, set())
-            if saved_messages:
-                print(f"   📋 Recent saved messages:")
-                for msg_id in list(saved_messages)[-3:]:  # Show last 3
-                    reactions = self.message_reactions.get(msg_id, {})
-                    reaction_str = ", ".join([f"{reaction}" for reaction in reactions.values()])
-                    print(f"      • {msg_id} {reaction_str}")
-            print()
+            if not self.active_users:
+                lines.append("No active users found.")
+                return lines
+                
+            # Individual user statistics
+            total_inbox = 0
+            for user_id in sorted(self.active_users):
+                name = user_names.get(user_id, user_id)
+                inbox_count = self.get_inbox_count(user_id)
+                saved_messages = self.user_saved_messages.get(user_id, ())
+                total_inbox += inbox_count
+                
+                lines.append(f"👤 {name} ({user_id})")
+                lines.append(f"   💾 Inbox messages: {inbox_count}")
+                lines.append(f"   📥 Saved messages for others: {len(saved_messages)}")
+                
+                # Show some saved message details
+                if saved_messages:
+                    lines.append("   📋 Recent saved messages:")
+                    for msg_id in islice(reversed(saved_messages), 3):  # Last 3, newest first
+                        savers = self.message_reactions.get(msg_id, ())
+                        lines.append(f"      • {msg_id} inbox_tray x{len(savers)}")
+                lines.append("")
+                
+            # Summary statistics
+            total_saved = self._total_saved
             
-        # Print summary statistics
-        total_inbox = sum(self.user_inbox_counts.values())
-        total_saved = sum(len(messages) for messages in self.user_saved_messages.values())
-        
-        print("-"*60)
-        print(f"📈 SUMMARY:")
-        print(f"   Total inbox messages tracked: {total_inbox}")
-        print(f"   Total saved messages for others: {total_saved}")
-        print(f"   Average inbox per user: {total_inbox/len(self.active_users):.1f}")
-        print(f"   Average saved per user: {total_saved/len(self.active_users):.1f}")
-        print("="*60)
+            lines.extend([
+                "-"*60,
+                "📈 SUMMARY:",
+                f"   Total inbox messages tracked: {total_inbox}",
+                f"   Total saved messages for others: {total_saved}",
+                f"   Average inbox per user: {total_inbox/len(self.active_users):.1f}",
+                f"   Average saved per user: {total_saved/len(self.active_users):.1f}",
+                "="*60,
+            ])
+        return lines
 
 def main():
     """Main function to run the bot"""
@@ -267,17 +589,18 @@ def main():
         tracker.start()
         
         # Print statistics every 5 seconds
-        import time
+        tracker.start_statistics_timer(5)
+        
+        # Keep the main thread alive so Ctrl+C can stop the bot
         while True:
-            time.sleep(5)  # 5 seconds
-            tracker.print_statistics()
+            time.sleep(1)
             
     except KeyboardInterrupt:
         print("\n🛑 Stopping bot...")
         tracker.stop()
-        tracker.print_statistics()
+        tracker.print_statistics(force=True)
     except Exception as e:
-        logger.error(f"Unexpected error: {e}")
+        logger.error("Unexpected error: %s", e)
         tracker.stop()
 
 if __name__ == "__main__":
@@ -4,10 +4,14 @@ Test script for the Slack Message Tracker Bot
 This script tests the bot's functionality without requiring actual Slack tokens.
 """
 
+import importlib
+import os
 import unittest
 from unittest.mock import Mock, patch, MagicMock
-from slack_bot import SlackMessageTracker
-from collections import defaultdict
+import slack_bot
+from slack_bot import SlackMessageTracker, RateLimitedClient
+from slack_sdk.errors import SlackApiError
+from collections import Counter
 
 class TestSlackMessageTracker(unittest.TestCase):
     
@@ -19,14 +23,15 @@ class TestSlackMessageTracker(unittest.TestCase):
             
     def test_initialization(self):
         """Test that the bot initializes correctly"""
-        self.assertIsInstance(self.tracker.user_inbox_counts, defaultdict)
-        self.assertIsInstance(self.tracker.user_saved_messages, defaultdict)
+        self.assertIsInstance(self.tracker.user_inbox_counts, Counter)
+        self.assertIsInstance(self.tracker.user_saved_messages, dict)
         self.assertIsInstance(self.tracker.active_users, set)
+        self.assertFalse(hasattr(self.tracker, '__dict__'))
         
     def test_handle_message_event(self):
         """Test message event handling"""
         # Mock channel members
-        self.tracker.get_channel_members = Mock(return_value=['U123', 'U456', 'U789'])
+        members = ['U123', 'U456', 'U789']
         
         # Test message event
         event = {
@@ -35,17 +40,124 @@ class TestSlackMessageTracker(unittest.TestCase):
             'ts': '1234567890.123'
         }
         
-        self.tracker.handle_message_event(event)
+        with patch.object(SlackMessageTracker, 'get_channel_members', return_value=members):
+            self.tracker.handle_message_event(event)
         
         # Check that inbox counts were updated for other users
-        self.assertEqual(self.tracker.user_inbox_counts['U456'], 1)
-        self.assertEqual(self.tracker.user_inbox_counts['U789'], 1)
-        self.assertEqual(self.tracker.user_inbox_counts['U123'], 0)  # Sender shouldn't be counted
+        self.assertEqual(self.tracker.get_inbox_count('U456'), 1)
+        self.assertEqual(self.tracker.get_inbox_count('U789'), 1)
+        self.assertEqual(self.tracker.get_inbox_count('U123'), 0)  # Sender shouldn't be counted
         
         # Check that users were added to active users
         self.assertIn('U456', self.tracker.active_users)
         self.assertIn('U789', self.tracker.active_users)
         
+    def test_message_counts_follow_channel_membership(self):
+        """Test that members are looked up once and joins/leaves adjust inbox counts"""
+        event = {'user': 'U123', 'channel': 'C123', 'ts': '1234567890.123'}
+        
+        with patch.object(SlackMessageTracker, 'get_channel_members', return_value=['U123', 'U456']) as get_channel_members:
+            self.tracker.handle_message_event(event)
+            self.tracker.handle_message_event(event)
+            get_channel_members.assert_called_once_with('C123')
+        self.assertEqual(self.tracker.get_inbox_count('U456'), 2)
+        
+        # A new member only counts messages sent after joining
+        self.tracker.process_event({'event': {'type': 'member_joined_channel', 'user': 'U789', 'channel': 'C123'}})
+        self.tracker.handle_message_event(event)
+        self.assertEqual(self.tracker.get_inbox_count('U789'), 1)
+        
+        # A member who left keeps the messages already received
+        self.tracker.process_event({'event': {'type': 'member_left_channel', 'user': 'U456', 'channel': 'C123'}})
+        self.tracker.handle_message_event(event)
+        self.assertEqual(self.tracker.get_inbox_count('U456'), 3)
+        self.assertEqual(self.tracker.get_inbox_count('U123'), 0)
+        
+    def test_socket_mode_request_acknowledged_before_processing(self):
+        """Test that events are acknowledged before they are processed"""
+        client = Mock()
+        req = Mock(type='events_api', envelope_id='E123', payload={'event': {'type': 'message'}})
+        
+        with patch.object(SlackMessageTracker, 'process_event') as process_event:
+            process_event.side_effect = lambda payload: client.send_socket_mode_response.assert_called_once()
+            self.tracker.handle_socket_mode_request(client, req)
+            
+        process_event.assert_called_once_with(req.payload)
+        
+    def test_missed_membership_events_repaired_after_ttl(self):
+        """Test that the member list is fetched again after the TTL and reconciled"""
+        event = {'user': 'U123', 'channel': 'C123', 'ts': '1234567890.123'}
+        
+        with patch.object(SlackMessageTracker, 'get_channel_members', return_value=['U123', 'U456']) as get_channel_members:
+            self.tracker.handle_message_event(event)
+            self.tracker.handle_message_event(event)
+            
+            # U456 leaves and U789 joins, but neither event arrives
+            get_channel_members.return_value = ['U123', 'U789']
+            self.tracker.handle_message_event(event)
+            self.assertEqual(get_channel_members.call_count, 1)
+            self.assertEqual(self.tracker.get_inbox_count('U789'), 0)
+            
+            # Once the TTL expires the next message refreshes the members first
+            self.tracker._members_fetched_at['C123'] -= self.tracker._members_ttl
+            self.tracker.handle_message_event(event)
+            self.tracker.handle_message_event(event)
+            
+        self.assertEqual(get_channel_members.call_count, 2)
+        self.assertEqual(self.tracker.get_inbox_count('U789'), 2)
+        self.assertEqual(self.tracker.get_inbox_count('U456'), 3)  # Kept, but no longer counting
+        self.assertEqual(self.tracker.channel_members['C123'], {'U123', 'U789'})
+        
+    def test_bot_leaving_channel_stops_tracking_it(self):
+        """Test that a channel is fetched again when the bot is added back to it"""
+        event = {'user': 'U123', 'channel': 'C123', 'ts': '1234567890.123'}
+        self.tracker._bot_user_id = 'UBOT'
+        
+        with patch.object(SlackMessageTracker, 'get_channel_members', return_value=['U123', 'U456', 'UBOT']) as get_channel_members:
+            self.tracker.handle_message_event(event)
+            self.tracker.process_event({'event': {'type': 'member_left_channel', 'user': 'UBOT', 'channel': 'C123'}})
+            self.assertNotIn('C123', self.tracker.channel_msg_count)
+            self.assertEqual(self.tracker.get_inbox_count('U456'), 1)
+            
+            # Back in the channel, with U789 having joined meanwhile
+            get_channel_members.return_value = ['U123', 'U789', 'UBOT']
+            self.tracker.handle_message_event(event)
+            
+        self.assertEqual(get_channel_members.call_count, 2)
+        self.assertEqual(self.tracker.get_inbox_count('U456'), 1)
+        self.assertEqual(self.tracker.get_inbox_count('U789'), 1)
+        
+        # The channel_left event sent to the bot is handled the same way
+        self.tracker.process_event({'event': {'type': 'channel_left', 'channel': 'C123'}})
+        self.assertNotIn('C123', self.tracker.channel_msg_count)
+        self.assertEqual(self.tracker.get_inbox_count('U789'), 1)
+        
+    def test_membership_changes_during_initial_member_fetch(self):
+        """Test that joins, leaves and messages arriving while members are fetched are applied"""
+        event = {'type': 'message', 'user': 'U123', 'channel': 'C123', 'ts': '1234567890.123'}
+        
+        def fetch_members(channel_id):
+            # Events delivered by other workers while the API call is in flight
+            self.tracker.process_event({'event': {'type': 'member_joined_channel', 'user': 'U789', 'channel': 'C123'}})
+            self.tracker.process_event({'event': {'type': 'member_left_channel', 'user': 'U456', 'channel': 'C123'}})
+            self.tracker.process_event({'event': {**event, 'user': 'U789'}})
+            # The list was read before those changes
+            return ['U123', 'U456']
+            
+        with patch.object(SlackMessageTracker, 'get_channel_members', side_effect=fetch_members):
+            self.tracker.handle_message_event(event)
+            
+        # Events are applied in arrival order on top of the fetched list
+        self.assertEqual(self.tracker._tracking_channels, {})
+        self.assertEqual(self.tracker.get_inbox_count('U123'), 1)
+        self.assertEqual(self.tracker.get_inbox_count('U456'), 1)
+        self.assertEqual(self.tracker.get_inbox_count('U789'), 0)  # Only their own message so far
+        
+        # The member who left keeps the first message but not later ones
+        self.tracker.handle_message_event(event)
+        self.assertEqual(self.tracker.get_inbox_count('U456'), 1)
+        self.assertEqual(self.tracker.get_inbox_count('U789'), 1)
+        
     def test_handle_reaction_added_inbox_tray(self):
         """Test inbox_tray reaction added event handling"""
         event = {
@@ -58,7 +170,7 @@ class TestSlackMessageTracker(unittest.TestCase):
         
         # Check that message was saved
         self.assertIn('1234567890.123', self.tracker.user_saved_messages['U123'])
-        self.assertEqual(self.tracker.message_reactions['1234567890.123']['U123'], 'inbox_tray')
+        self.assertIn('U123', self.tracker.message_reactions['1234567890.123'])
         self.assertIn('U123', self.tracker.active_users)
         
     def test_handle_reaction_added_other_emoji(self):
@@ -72,7 +184,7 @@ class TestSlackMessageTracker(unittest.TestCase):
         self.tracker.handle_reaction_added(event)
         
         # Check that message was NOT saved
-        self.assertNotIn('1234567890.123', self.tracker.user_saved_messages['U123'])
+        self.assertNotIn('1234567890.123', self.tracker.user_saved_messages.get('U123', set()))
         self.assertNotIn('1234567890.123', self.tracker.message_reactions)
         self.assertNotIn('U123', self.tracker.active_users)
         
@@ -95,10 +207,90 @@ class TestSlackMessageTracker(unittest.TestCase):
         self.tracker.handle_reaction_removed(remove_event)
         
         # Check that message was unsaved
-        self.assertNotIn('1234567890.123', self.tracker.user_saved_messages['U123'])
+        self.assertNotIn('1234567890.123', self.tracker.user_saved_messages.get('U123', set()))
         # The message_reactions entry should be completely removed
         self.assertNotIn('1234567890.123', self.tracker.message_reactions)
         
+    def test_saved_messages_set_reused(self):
+        """Test that emptied saved-message containers are recycled"""
+        event = {
+            'user': 'U123',
+            'item': {'ts': '1234567890.123'},
+            'reaction': 'inbox_tray'
+        }
+        self.tracker.handle_reaction_added(event)
+        saved_messages = self.tracker.user_saved_messages['U123']
+        savers = self.tracker.message_reactions['1234567890.123']
+        
+        # Removing the last saved message drops the user's and the message's entries
+        self.tracker.handle_reaction_removed(event)
+        self.assertNotIn('U123', self.tracker.user_saved_messages)
+        self.assertNotIn('1234567890.123', self.tracker.message_reactions)
+        
+        # The next save gets the pooled containers back
+        self.tracker.handle_reaction_added({**event, 'user': 'U456'})
+        self.assertIs(self.tracker.user_saved_messages['U456'], saved_messages)
+        self.assertIs(self.tracker.message_reactions['1234567890.123'], savers)
+        self.assertEqual(list(saved_messages), ['1234567890.123'])
+        self.assertEqual(self.tracker.message_reactions['1234567890.123'], {'U456'})
+        
+    def test_total_saved_count(self):
+        """Test that the saved-message total ignores duplicate saves and unknown removals"""
+        event = {
+            'user': 'U123',
+            'item': {'ts': '1234567890.123'},
+            'reaction': 'inbox_tray'
+        }
+        self.tracker.handle_reaction_added(event)
+        self.tracker.handle_reaction_added(event)
+        self.assertEqual(self.tracker._total_saved, 1)
+        
+        self.tracker.handle_reaction_removed(event)
+        self.tracker.handle_reaction_removed(event)
+        self.assertEqual(self.tracker._total_saved, 0)
+        
+    def test_recent_saved_messages(self):
+        """Test that the report shows up to the last three messages a user still has saved"""
+        import io
+        for message_id in ['msg1', 'msg2', 'msg3', 'msg4', 'msg5']:
+            self.tracker.handle_reaction_added({
+                'user': 'U123',
+                'item': {'ts': message_id},
+                'reaction': 'inbox_tray'
+            })
+        self.assertEqual(list(self.tracker.user_saved_messages['U123']), ['msg1', 'msg2', 'msg3', 'msg4', 'msg5'])
+        
+        # Unsaving the most recent messages falls back to older ones
+        for message_id in ['msg3', 'msg4', 'msg5']:
+            self.tracker.handle_reaction_removed({
+                'user': 'U123',
+                'item': {'ts': message_id},
+                'reaction': 'inbox_tray'
+            })
+            
+        with patch.object(self.tracker.client, 'users_list', return_value={'members': []}), \
+                patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            self.tracker.print_statistics()
+            
+        output = stdout.getvalue()
+        self.assertIn('Saved messages for others: 2', output)
+        self.assertIn('Recent saved messages:', output)
+        self.assertIn('• msg2 inbox_tray x1', output)
+        self.assertIn('• msg1 inbox_tray x1', output)
+        self.assertNotIn('msg5', output)
+        
+    def test_handle_reaction_removed_unknown_message(self):
+        """Test that removing a reaction from an untracked message stores nothing"""
+        event = {
+            'user': 'U123',
+            'item': {'ts': '1234567890.123'},
+            'reaction': 'inbox_tray'
+        }
+        self.tracker.handle_reaction_removed(event)
+        
+        self.assertEqual(self.tracker.message_reactions, {})
+        self.assertEqual(self.tracker.user_saved_messages, {})
+        
     def test_handle_reaction_removed_other_emoji(self):
         """Test other reaction removed event handling (should not affect saved messages)"""
         # First add an inbox_tray reaction
@@ -119,7 +311,7 @@ class TestSlackMessageTracker(unittest.TestCase):
         
         # Check that message is still saved
         self.assertIn('1234567890.123', self.tracker.user_saved_messages['U123'])
-        self.assertEqual(self.tracker.message_reactions['1234567890.123']['U123'], 'inbox_tray')
+        self.assertIn('U123', self.tracker.message_reactions['1234567890.123'])
         
     def test_multiple_reactions_same_message(self):
         """Test multiple users reacting to the same message with inbox_tray"""
@@ -141,8 +333,8 @@ class TestSlackMessageTracker(unittest.TestCase):
         
         # Check only inbox_tray reaction is saved
         self.assertIn('1234567890.123', self.tracker.user_saved_messages['U123'])
-        self.assertNotIn('1234567890.123', self.tracker.user_saved_messages['U456'])
-        self.assertEqual(self.tracker.message_reactions['1234567890.123']['U123'], 'inbox_tray')
+        self.assertNotIn('1234567890.123', self.tracker.user_saved_messages.get('U456', set()))
+        self.assertIn('U123', self.tracker.message_reactions['1234567890.123'])
         self.assertNotIn('U456', self.tracker.message_reactions['1234567890.123'])
         
     def test_statistics_calculation(self):
@@ -150,22 +342,23 @@ class TestSlackMessageTracker(unittest.TestCase):
         # Add some test data
         self.tracker.user_inbox_counts['U123'] = 10
         self.tracker.user_inbox_counts['U456'] = 15
-        self.tracker.user_saved_messages['U123'] = {'msg1', 'msg2'}
-        self.tracker.user_saved_messages['U456'] = {'msg3'}
-        self.tracker.message_reactions['msg1'] = {'U123': 'inbox_tray'}
-        self.tracker.message_reactions['msg2'] = {'U123': 'inbox_tray'}
-        self.tracker.message_reactions['msg3'] = {'U456': 'inbox_tray'}
+        for user_id, message_id in [('U123', 'msg1'), ('U123', 'msg2'), ('U456', 'msg3')]:
+            self.tracker.handle_reaction_added({
+                'user': user_id,
+                'item': {'ts': message_id},
+                'reaction': 'inbox_tray'
+            })
         self.tracker.active_users = {'U123', 'U456'}
         
-        # Mock user info
-        mock_user_info = {
-            'user': {
-                'real_name': 'Test User',
-                'name': 'testuser'
-            }
+        # Mock users list
+        mock_users_list = {
+            'members': [
+                {'id': 'U123', 'real_name': 'Test User', 'name': 'testuser'},
+                {'id': 'U456', 'real_name': 'Other User', 'name': 'otheruser'}
+            ]
         }
         
-        with patch.object(self.tracker.client, 'users_info', return_value=mock_user_info):
+        with patch.object(self.tracker.client, 'users_list', return_value=mock_users_list):
             # Capture print output
             import io
             import sys
@@ -187,29 +380,134 @@ class TestSlackMessageTracker(unittest.TestCase):
             self.assertIn('Total inbox messages tracked: 25', output)
             self.assertIn('Total saved messages for others: 3', output)
             
+    def test_statistics_only_printed_when_changed(self):
+        """Test that an unchanged report is not printed again"""
+        import io
+        reaction_event = {
+            'user': 'U123',
+            'item': {'ts': '1234567890.123'},
+            'reaction': 'inbox_tray'
+        }
+        
+        with patch.object(self.tracker.client, 'users_list', return_value={'members': []}), \
+                patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            self.tracker.print_statistics()
+            self.assertIn('No active users found.', stdout.getvalue())
+            
+            # Nothing changed since the last report
+            stdout.seek(0)
+            stdout.truncate()
+            self.tracker.print_statistics()
+            self.assertEqual(stdout.getvalue(), '')
+            
+            # A handled event marks the statistics as changed
+            self.tracker.handle_reaction_added(reaction_event)
+            self.tracker.print_statistics()
+            self.assertIn('Saved messages for others: 1', stdout.getvalue())
+            
+            # Forcing prints even when nothing changed
+            stdout.seek(0)
+            stdout.truncate()
+            self.tracker.print_statistics(force=True)
+            self.assertIn('Saved messages for others: 1', stdout.getvalue())
+            
+    def test_statistics_retried_after_failure(self):
+        """Test that a report that failed to print is attempted again on the next tick"""
+        import io
+        
+        with patch.object(self.tracker.client, 'users_list', side_effect=[ConnectionError('timed out'), {'members': []}]), \
+                patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            self.tracker.active_users = {'U123'}
+            with self.assertRaises(ConnectionError):
+                self.tracker.print_statistics()
+            self.assertEqual(stdout.getvalue(), '')
+            
+            self.tracker.print_statistics()
+            self.assertIn('U123', stdout.getvalue())
+            
+    def test_user_names_cached(self):
+        """Test that the paginated users list is fetched once and reused"""
+        pages = [
+            {'members': [{'id': 'U123', 'real_name': 'Test User', 'name': 'testuser'}],
+             'response_metadata': {'next_cursor': 'page2'}},
+            {'members': [{'id': 'U456', 'real_name': '', 'name': 'otheruser'}],
+             'response_metadata': {'next_cursor': ''}}
+        ]
+        
+        with patch.object(self.tracker.client, 'users_list', side_effect=pages) as users_list:
+            expected = {'U123': 'Test User', 'U456': 'otheruser', 'U789': 'U789'}
+            self.assertEqual(self.tracker.get_user_names(['U123', 'U456', 'U789']), expected)
+            self.assertEqual(self.tracker.get_user_names(['U123', 'U456', 'U789']), expected)
+            self.assertEqual(users_list.call_count, 2)
+            users_list.assert_called_with(limit=1000, cursor='page2')
+            
     def test_app_mention_handling(self):
         """Test app mention event handling"""
         # Mock the send methods
-        self.tracker.send_user_stats = Mock()
-        self.tracker.send_help_message = Mock()
+        with patch.object(SlackMessageTracker, 'send_user_stats') as send_user_stats, \
+                patch.object(SlackMessageTracker, 'send_help_message') as send_help_message:
+            # Test stats command
+            stats_event = {
+                'user': 'U123',
+                'channel': 'C123',
+                'text': '<@BOT_ID> stats'
+            }
+            self.tracker.handle_app_mention(stats_event)
+            send_user_stats.assert_called_once_with('U123', 'C123')
+            
+            # Test help command
+            help_event = {
+                'user': 'U123',
+                'channel': 'C123',
+                'text': '<@BOT_ID> help'
+            }
+            self.tracker.handle_app_mention(help_event)
+            send_help_message.assert_called_once_with('C123')
+            
+            # Commands are matched as whole words, ignoring case and punctuation
+            self.tracker.handle_app_mention({**stats_event, 'text': '<@BOT_ID> Statistics, please!'})
+            self.assertEqual(send_user_stats.call_count, 2)
+            self.tracker.handle_app_mention({**help_event, 'text': '<@BOT_ID> that was helpful'})
+            send_help_message.assert_called_once_with('C123')
+
+class TestLoggingConfiguration(unittest.TestCase):
+    
+    def tearDown(self):
+        importlib.reload(slack_bot)
         
-        # Test stats command
-        stats_event = {
-            'user': 'U123',
-            'channel': 'C123',
-            'text': '<@BOT_ID> stats'
-        }
-        self.tracker.handle_app_mention(stats_event)
-        self.tracker.send_user_stats.assert_called_once_with('U123', 'C123')
+    def test_unknown_log_level_falls_back_to_info(self):
+        """Test that a misspelled LOG_LEVEL doesn't prevent the bot from loading"""
+        with patch.dict(os.environ, {'LOG_LEVEL': 'VERBOSE'}), \
+                self.assertLogs('slack_bot', level='WARNING') as logs:
+            importlib.reload(slack_bot)
+            
+        self.assertEqual(slack_bot.log_level, None)
+        self.assertIn("Unknown LOG_LEVEL 'VERBOSE', using INFO", logs.output[0])
+
+class TestRateLimitedClient(unittest.TestCase):
+    
+    def test_retries_rate_limited_calls(self):
+        """Test that 429 responses are retried after the Retry-After delay"""
+        rate_limited = SlackApiError('ratelimited', Mock(status_code=429, headers={'Retry-After': '2'}))
+        web_client = Mock()
+        web_client.users_list.side_effect = [rate_limited, {'members': []}]
+        client = RateLimitedClient(web_client)
         
-        # Test help command
-        help_event = {
-            'user': 'U123',
-            'channel': 'C123',
-            'text': '<@BOT_ID> help'
-        }
-        self.tracker.handle_app_mention(help_event)
-        self.tracker.send_help_message.assert_called_once_with('C123')
+        with patch('slack_bot.time.sleep') as sleep:
+            self.assertEqual(client.users_list(limit=1000), {'members': []})
+            
+        sleep.assert_called_once_with(2.0)
+        self.assertEqual(web_client.users_list.call_count, 2)
+        
+    def test_other_errors_not_retried(self):
+        """Test that non rate-limit errors are raised immediately"""
+        web_client = Mock()
+        web_client.chat_postMessage.side_effect = SlackApiError('channel_not_found', Mock(status_code=404, headers={}))
+        client = RateLimitedClient(web_client)
+        
+        with self.assertRaises(SlackApiError):
+            client.chat_postMessage(channel='C123', text='hi')
+        self.assertEqual(web_client.chat_postMessage.call_count, 1)
 
 def run_tests():
     """Run all tests"""
@@ -217,7 +515,12 @@ def run_tests():
     print("=" * 50)
     
     # Create test suite
-    suite = unittest.TestLoader().loadTestsFromTestCase(TestSlackMessageTracker)
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite([
+        loader.loadTestsFromTestCase(TestSlackMessageTracker),
+        loader.loadTestsFromTestCase(TestRateLimitedClient),
+        loader.loadTestsFromTestCase(TestLoggingConfiguration)
+    ])
     
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)